@@ -35,26 +35,9 @@ def send_professional_email(subject, html_body):
     except Exception as e:
         print(f"Email error: {e}")
 
-BINANCE_FUTURES = ccxt.binance({
-    'enableRateLimit': True,
-    'options': {
-        'defaultType': 'swap',  # perpetual swaps
-        'urls': {
-            'api': {
-                'public': 'https://fapi.binance.com/fapi/v1',
-                'private': 'https://fapi.binance.com/fapi/v1',
-            }
-        }
-    }
-})
-
-BINANCE_SPOT = ccxt.binance({
-    'enableRateLimit': True,
-    'urls': {
-        'api': {
-            'public': 'https://api.binance.com/api/v3',
-        }
-    }
+# Binance (spot + USDT-margined perps); ccxt routes each symbol to the right API
+BINANCE = ccxt.binance({
+    'enableRateLimit': True
 })
 
 TIMEFRAMES = {
@@ -68,6 +51,55 @@ QUOTES = {
     "BTC": "BTC"
 }
 
+# Contract multiplier prefixes, e.g. 1000PEPE/USDT:USDT trades PEPE
+MULTIPLIER_PREFIXES = ("1000000", "1000", "1M")
+
+# CoinGecko ticker -> Binance ticker for renamed assets
+RENAMED_TICKERS = {
+    "MATIC": "POL",
+    "RNDR": "RENDER",
+    "FTM": "S",
+    "EOS": "A",
+}
+
+def build_symbol_index():
+    # {quote: {base or alias: unified symbol}}; exact bases beat aliases, perps beat spot.
+    # ccxt keeps the loaded markets, so the OHLCV calls don't fetch them again.
+    markets = BINANCE.load_markets()
+    best = {}
+    for symbol, m in markets.items():
+        if not m.get('active', True):
+            continue
+        is_perp = bool(m.get('swap') and m.get('linear'))
+        if not (m.get('spot') or is_perp):
+            continue
+
+        names = {m['base'], (m.get('baseId') or '').upper()} - {''}
+        aliases = set()
+        for name in names:
+            for prefix in MULTIPLIER_PREFIXES:
+                if name.startswith(prefix) and len(name) > len(prefix):
+                    aliases.add(name[len(prefix):])
+                    break
+
+        for base, is_alias in [(n, False) for n in names] + [(a, True) for a in aliases - names]:
+            rank = (is_alias, not is_perp)
+            key = (m['quote'], base)
+            if key not in best or rank < best[key][0]:
+                best[key] = (rank, symbol)
+
+    index = {}
+    for (quote, base), (_, symbol) in best.items():
+        index.setdefault(quote, {})[base] = symbol
+    return index
+
+def resolve_symbol(index, base, quote):
+    pairs = index.get(quote, {})
+    for candidate in (base, RENAMED_TICKERS.get(base)):
+        if candidate and candidate in pairs:
+            return pairs[candidate]
+    return None
+
 def get_data(symbol, tf):
     try:
         df = pd.DataFrame(
@@ -75,7 +107,8 @@ def get_data(symbol, tf):
             columns=['ts','o','h','l','c','v']
         )
         return df
-    except:
+    except Exception as e:
+        print(f"Fetch error {symbol} {tf}: {e}")
         return pd.DataFrame()
 
 def score_asset(df):
@@ -144,6 +177,18 @@ def run_scan():
     ).json()
     base_assets = [c['symbol'].upper() for c in coins]
 
+    # Only request pairs that actually exist on the venue
+    symbol_index = build_symbol_index()
+    resolved = {}
+    unresolved = 0
+    for quote in QUOTES.values():
+        symbols = [resolve_symbol(symbol_index, base, quote) for base in base_assets]
+        unresolved += symbols.count(None)
+        resolved[quote] = list(dict.fromkeys(s for s in symbols if s))
+    pair_count = sum(len(syms) for syms in resolved.values())
+    print(f"Resolved {pair_count} pairs on Binance ({unresolved} coin/quote combinations not listed) "
+          f"- avoided {unresolved * len(TIMEFRAMES)} dead OHLCV requests\n")
+
     # Build HTML report
     html = f"""
     <html>
@@ -163,7 +208,7 @@ def run_scan():
     <body>
     <h1>James' Multi-Market Long-Trend Scanner</h1>
     <p style="text-align:center;"><strong>Report Generated:</strong> {datetime.now():%B %d, %Y · %I:%M %p}</p>
-    <p style="text-align:center;">Top 5 assets per timeframe/quote based on proprietary multi-indicator scoring (Binance Perpetual Futures).</p>
+    <p style="text-align:center;">Top 5 assets per timeframe/quote based on proprietary multi-indicator scoring (Binance Perpetual Futures, Spot where no perp is listed).</p>
     """
 
     for quote_name, quote in QUOTES.items():
@@ -174,8 +219,7 @@ def run_scan():
 
         for label, tf in TIMEFRAMES.items():
             rankings = []
-            for base in base_assets:
-                symbol = f"{base}{quote}"  # Original format: e.g., BTCUSDT, ETHBTC
+            for symbol in resolved[quote]:
                 df = get_data(symbol, tf)
                 if len(df) < 60:
                     continue
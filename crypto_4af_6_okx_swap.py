@@ -4,7 +4,7 @@ import okx.MarketData as MarketData # ← Correct for get_candlesticks
 import pandas as pd
 import pandas_ta_classic as ta
 from tabulate import tabulate
-from datetime import datetime
+from datetime import datetime, timezone
 import warnings
 import smtplib
 from email.mime.text import MIMEText
@@ -12,6 +12,9 @@ from email.mime.multipart import MIMEMultipart
 import os
 import time
 
+import scan_archive
+import scan_store
+
 warnings.filterwarnings("ignore")
 
 print("Script loaded with __name__ =", __name__)
@@ -64,6 +67,55 @@ TIMEFRAMES = {
     "4H": "4H"
 }
 
+# Optional time budget (seconds) for fetching + scoring; 0 = scan everything.
+# When it runs out, the report ships with whatever was scored and the rest is
+# left in a checkpoint for the next run to pick up.
+SCAN_TIME_BUDGET = float(os.environ.get('SCAN_TIME_BUDGET', 0))
+CHECKPOINT_MAX_AGE = 6 * 3600   # don't resume a scan that began longer ago than this
+CHECKPOINT_EVERY = 10           # instruments between checkpoint saves
+
+def get_tickers(inst_type):
+    try:
+        response = market_api.get_tickers(instType=inst_type)
+        if response["code"] != "0":
+            print(f"Ticker fetch error {inst_type}: {response['msg']}")
+            return []
+        return response["data"]
+    except Exception as e:
+        print(f"Ticker fetch error {inst_type}: {e}")
+        return []
+
+def get_turnover():
+    # Approximate 24h turnover in USD per instId, used only to order the scan.
+    # SWAP volCcy24h is in the base coin (x last -> quote/USD); SPOT volCcy24h
+    # is already in the quote coin, so BTC-quoted pairs are converted via BTC-USDT.
+    turnover = {}
+    spot = get_tickers("SPOT")
+    btc_usd = next((float(t["last"]) for t in spot if t["instId"] == "BTC-USDT"), 0)
+    quote_usd = {"USDT": 1.0, "USDC": 1.0, "USD": 1.0, "BTC": btc_usd}
+
+    for t in spot:
+        rate = quote_usd.get(t["instId"].split("-")[-1])
+        if not rate:
+            continue
+        try:
+            turnover[t["instId"]] = float(t["volCcy24h"]) * rate
+        except (KeyError, ValueError):
+            continue
+
+    for t in get_tickers("SWAP"):
+        try:
+            turnover[t["instId"]] = float(t["volCcy24h"]) * float(t["last"])
+        except (KeyError, ValueError):
+            continue
+    return turnover
+
+def prioritise(symbols):
+    # Previously high-scoring instruments first, then the most liquid
+    prev = scan_store.previous_scores()
+    turnover = get_turnover()
+    return sorted(symbols, key=lambda s: (-prev.get(s[0], -1), -turnover.get(s[0], 0)))
+
 def get_data(inst_id, tf):
     try:
         response = market_api.get_candlesticks(instId=inst_id, bar=tf, limit=200)  # ← Fixed client
@@ -81,8 +133,10 @@ def get_data(inst_id, tf):
         return pd.DataFrame()
 
 # Your score_asset function (paste full version here)
-def score_asset(df):
+# Pass a dict as `blocks` to get the per-block sub-scores (dmi, rsi, macd, ichimoku, ma)
+def score_asset(df, blocks=None):
     score = 0
+    sub = {}
     # === DMI ===
     adx = ta.adx(high=df['h'], low=df['l'], close=df['c'])
     df['adx'] = adx['ADX_14']
@@ -98,6 +152,7 @@ def score_asset(df):
     if df['minus'].iloc[-1] < 10: score += 5
     if df['minus'].iloc[-1] < df['minus'].iloc[-2] < df['minus'].iloc[-3]:
         score += 5
+    sub['dmi'] = score - sum(sub.values())
     # === RSI ===
     df['rsi'] = ta.rsi(df['c'], length=14)
     df['rsi_ma'] = df['rsi'].rolling(14).mean()
@@ -105,6 +160,7 @@ def score_asset(df):
     if df['rsi'].iloc[-1] < 83: score += 5
     if df['rsi'].iloc[-1] > df['rsi_ma'].iloc[-1]: score += 5
     if df['rsi_ma'].iloc[-1] < 55: score += 5
+    sub['rsi'] = score - sum(sub.values())
     # === MACD ===
     macd = ta.macd(df['c'])
     df['macd'] = macd['MACD_12_26_9']
@@ -126,6 +182,7 @@ def score_asset(df):
         score += 15
     elif cross_above.iloc[-7:].any():
         score += 10
+    sub['macd'] = score - sum(sub.values())
     # === ICHIMOKU STRUCTURE ===
     df['ema3'] = ta.ema(df['c'], length=3)
     df['ma3'] = ta.sma(df['c'], length=3)
@@ -138,11 +195,15 @@ def score_asset(df):
     if cl < df['ema3'].iloc[-1]: score += 5
     if cl > df['ma3'].iloc[-1] or cl > df['ema5'].iloc[-1] or cl > df['ma6'].iloc[-1]: score += 5
     if bl > df['ma6'].iloc[-1]: score += 5
+    sub['ichimoku'] = score - sum(sub.values())
     # === MOVING AVERAGES ===
     df['ma20'] = ta.sma(df['c'], length=20)
     df['ma33'] = ta.sma(df['c'], length=33)
     if df['ma20'].iloc[-1] > df['ma20'].iloc[-2]: score += 5
     if df['ma33'].iloc[-1] > df['ma33'].iloc[-2]: score += 5
+    sub['ma'] = score - sum(sub.values())
+    if blocks is not None:
+        blocks.update(sub)
     return score
 
 def run_scan():
@@ -232,28 +293,106 @@ def run_scan():
     <h2>USDT-Margined (Linear) & BTC-Margined (Inverse) Perpetual Markets</h2>
     """
 
-    for label, tf in TIMEFRAMES.items():
-        rankings = []
-        for inst_id, market_type in symbols:   # ← Changed from perpetual_symbols to symbols + unpack tuple
+    # ── Priority queue + optional deadline ──
+    # One timestamp per run: latest.json, the archive file and each row's scanned_at
+    run_ts = datetime.now(timezone.utc).replace(microsecond=0)
+    run_stamp = run_ts.strftime('%Y-%m-%dT%H:%M:%SZ')
+    started_at = time.time()
+    deadline = time.monotonic() + SCAN_TIME_BUDGET if SCAN_TIME_BUDGET > 0 else None
+    store_results = {label: [] for label in TIMEFRAMES}
+    unarchived = {label: [] for label in TIMEFRAMES}    # rows not yet in the archive
+    done = set()
+    fetch_failed = []
+
+    checkpoint = scan_store.load_checkpoint(CHECKPOINT_MAX_AGE)
+    if checkpoint:
+        started_at = checkpoint["started_at"]
+        done = set(checkpoint["done"])
+        for label, rows in checkpoint["results"].items():
+            store_results.setdefault(label, []).extend(rows)
+        for label, rows in checkpoint.get("unarchived", {}).items():
+            unarchived.setdefault(label, []).extend(rows)
+        print(f"Resuming checkpoint: {len(done)} instruments already done")
+
+    queue = [s for s in prioritise(symbols) if s[0] not in done]
+    deadline_hit = False
+
+    for i, (inst_id, market_type) in enumerate(queue, start=1):
+        if deadline is not None and time.monotonic() >= deadline:
+            deadline_hit = True
+            print(f"Time budget of {SCAN_TIME_BUDGET:.0f}s reached - {len(queue) - i + 1} instruments left for the next run")
+            break
+
+        fetched = False
+        for label, tf in TIMEFRAMES.items():
             try:
                 df = get_data(inst_id, tf)
                 time.sleep(0.2)  # ← Add this to avoid rate limits (very important now with more symbols)
+                if df.empty:
+                    continue
+                fetched = True
                 if len(df) < 60:
                     continue
-                score = score_asset(df)
-
-                # Improved display name: shows market type clearly
-                display_symbol = inst_id.replace('-SWAP', f' {market_type}').replace('-BTC', f' {market_type}')
-
-                rankings.append([
-                    display_symbol,
-                    score,
-                    f"{df['c'].iloc[-1]:.8f}"
-                ])
+                blocks = {}
+                score = score_asset(df, blocks)
+                row = {
+                    'instId': inst_id,
+                    'market_type': market_type,
+                    'score': score,
+                    'price': float(df['c'].iloc[-1]),
+                    'scanned_at': run_stamp,
+                    'blocks': blocks,
+                    'indicators': scan_store.indicator_snapshot(df),
+                }
+                store_results[label].append(row)
+                unarchived[label].append(row)
             except Exception as e:
                 print(f"Error processing {inst_id} ({market_type}): {e}")
                 continue
 
+        # Instruments whose fetches all failed are left out of `done`, so a resumed
+        # run (deadline hit) retries them; a completed run reports them as failures
+        if fetched:
+            done.add(inst_id)
+        else:
+            fetch_failed.append(inst_id)
+        if deadline is not None and i % CHECKPOINT_EVERY == 0:
+            scan_store.save_checkpoint(started_at, done, store_results, unarchived)
+
+    symbol_ids = {inst_id for inst_id, _ in symbols}
+    scored_ids = {row['instId'] for rows in store_results.values() for row in rows} & symbol_ids
+    too_short = len((done & symbol_ids) - scored_ids)
+    scored = len(scored_ids)
+    coverage = {
+        'scored': scored,
+        'total': len(symbols),
+        'too_short': too_short,
+        'fetch_failed': len(fetch_failed),
+        'not_reached': len(symbols) - scored - too_short - len(fetch_failed),
+        'complete': not deadline_hit,
+    }
+    coverage_note = (f"{scored}/{len(symbols)} instruments scored, {too_short} with under 60 candles, "
+                     f"{len(fetch_failed)} fetch failures, {coverage['not_reached']} not reached")
+    resumed = any(row.get('scanned_at', run_stamp) != run_stamp for rows in store_results.values() for row in rows)
+    print(f"Coverage: {coverage_note}" + (" (partial - time budget reached)" if deadline_hit else ""))
+    html += f"<p style='text-align:center;'><strong>Coverage:</strong> {coverage_note}"
+    html += " (partial - time budget reached, remainder resumes next run)</p>" if deadline_hit else "</p>"
+    if resumed:
+        html += "<p style='text-align:center;'>Rows marked (from HH:MM UTC) were scored by an earlier, interrupted run.</p>"
+
+    for label, tf in TIMEFRAMES.items():
+        rankings = []
+        for row in store_results[label]:
+            # Improved display name: shows market type clearly
+            display_symbol = row['instId'].replace('-SWAP', f" {row['market_type']}").replace('-BTC', f" {row['market_type']}")
+            if row.get('scanned_at', run_stamp) != run_stamp:
+                display_symbol += f" (from {row['scanned_at'][11:16]} UTC)"
+            rankings.append([
+                display_symbol,
+                row['score'],
+                f"{row['price']:.8f}"
+            ])
+
         top10 = sorted(rankings, key=lambda x: -x[1])[:10]
         print(f"\n▶ {label} ({tf.upper()})\n")
         if top10:
@@ -268,6 +407,23 @@ def run_scan():
         else:
             html += "<p style='text-align:center;'>No qualifying assets.</p>"
 
+    # Full rankings (incl. resumed rows, each with its scanned_at) for the local
+    # query API (scan_api.py); the archive gets every row not archived yet
+    try:
+        scan_store.write_scan(store_results, scanner="crypto_4af_6", generated_at=run_stamp, coverage=coverage)
+    except Exception as e:
+        print(f"Result store write failed: {e}")
+    try:
+        scan_archive.append_run(unarchived, run_ts=run_ts)
+        unarchived = {}
+    except Exception as e:
+        print(f"Scan archive write failed: {e}")
+
+    if deadline_hit:
+        scan_store.save_checkpoint(started_at, done, store_results, unarchived)
+    else:
+        scan_store.clear_checkpoint()
+
     html += """
     <div class="footer">
     <p><strong>Disclaimer:</strong> For informational purposes only. Not financial advice.</p>
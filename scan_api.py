@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# Local read-only HTTP API over the latest scan results (see scan_store.py).
+# Rankings are served from memory and only re-read when a scan has rewritten
+# latest.json; /history reads the memory-mapped archive (see scan_archive.py).
+# No exchange calls are ever made from here.
+#
+#   python scan_api.py [--host 127.0.0.1] [--port 8765] [--results-dir scan_results] [--archive-dir ...]
+#
+#   GET /health
+#   GET /timeframes
+#   GET /top?tf=Daily&k=10
+#   GET /score?instId=BTC-USDT-SWAP[&tf=Daily]
+#   GET /history?instId=BTC-USDT-SWAP[&tf=Daily][&limit=100]
+import argparse
+import json
+import os
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import scan_archive
+import scan_store
+
+
+class ResultCache:
+    def __init__(self, results_dir=None, archive_dir=None):
+        self.results_dir = results_dir or scan_store.RESULTS_DIR
+        self.archive_dir = archive_dir or scan_archive.ARCHIVE_DIR
+        self.lock = threading.Lock()
+        self.latest = None
+        self.latest_mtime = None
+        self.by_inst = {}
+
+    def refresh(self):
+        with self.lock:
+            self._refresh_latest()
+
+    def _refresh_latest(self):
+        path = scan_store.latest_path(self.results_dir)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self.latest_mtime:
+            return
+
+        with open(path) as f:
+            latest = json.load(f)
+
+        by_inst = defaultdict(dict)
+        for label, rows in latest['timeframes'].items():
+            for rank, row in enumerate(rows, start=1):
+                by_inst[row['instId']][label] = dict(row, rank=rank)
+
+        self.latest = latest
+        self.by_inst = dict(by_inst)
+        self.latest_mtime = mtime
+
+    def top(self, tf, k):
+        rows = self.latest['timeframes'].get(tf)
+        if rows is None:
+            return None
+        return rows[:k]
+
+    def score(self, inst_id, tf=None):
+        entry = self.by_inst.get(inst_id)
+        if entry is None:
+            return None
+        if tf is not None:
+            return {tf: entry[tf]} if tf in entry else None
+        return entry
+
+    def score_history(self, inst_id, tf=None, limit=None):
+        table = scan_archive.read_archive(
+            inst_ids=inst_id, timeframes=tf,
+            columns=['run_ts', 'timeframe', 'score', 'price'],
+            limit=limit, archive_dir=self.archive_dir,
+        )
+        return [
+            {'ts': r['run_ts'].strftime('%Y-%m-%dT%H:%M:%SZ'), 'tf': r['timeframe'],
+             'score': r['score'], 'price': r['price']}
+            for r in table.to_pylist()
+        ]
+
+def make_handler(cache):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            cache.refresh()
+
+            if url.path == '/health':
+                return self._send(200, {
+                    'status': 'ok',
+                    'generated_at': cache.latest['generated_at'] if cache.latest else None,
+                    'coverage': cache.latest.get('coverage') if cache.latest else None,
+                })
+
+            try:
+                if url.path == '/history':
+                    inst_id = params.get('instId')
+                    if not inst_id:
+                        return self._send(400, {'error': 'instId is required'})
+                    limit = int(params['limit']) if 'limit' in params else None
+                    if limit is not None and limit < 1:
+                        return self._send(400, {'error': 'limit must be at least 1'})
+                    return self._send(200, {
+                        'instId': inst_id,
+                        'history': cache.score_history(inst_id, params.get('tf'), limit),
+                    })
+
+                # Everything below is served from latest.json; /history only needs the archive
+                if cache.latest is None:
+                    return self._send(503, {'error': 'no scan results yet'})
+
+                if url.path == '/timeframes':
+                    return self._send(200, {
+                        'generated_at': cache.latest['generated_at'],
+                        'timeframes': {tf: len(rows) for tf, rows in cache.latest['timeframes'].items()},
+                    })
+
+                if url.path == '/top':
+                    tf = params.get('tf')
+                    if not tf:
+                        return self._send(400, {'error': 'tf is required'})
+                    k = int(params.get('k', 10))
+                    if k < 1:
+                        return self._send(400, {'error': 'k must be at least 1'})
+                    rows = cache.top(tf, k)
+                    if rows is None:
+                        return self._send(404, {'error': f'unknown timeframe: {tf}'})
+                    return self._send(200, {
+                        'generated_at': cache.latest['generated_at'],
+                        'tf': tf,
+                        'results': rows,
+                    })
+
+                if url.path == '/score':
+                    inst_id = params.get('instId')
+                    if not inst_id:
+                        return self._send(400, {'error': 'instId is required'})
+                    entry = cache.score(inst_id, params.get('tf'))
+                    if entry is None:
+                        return self._send(404, {'error': f'no score for {inst_id}'})
+                    return self._send(200, {
+                        'generated_at': cache.latest['generated_at'],
+                        'instId': inst_id,
+                        'timeframes': entry,
+                    })
+            except ValueError as e:
+                return self._send(400, {'error': str(e)})
+
+            return self._send(404, {'error': f'unknown endpoint: {url.path}'})
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the latest scanner rankings over local HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--results-dir', default=scan_store.RESULTS_DIR)
+    parser.add_argument('--archive-dir', default=scan_archive.ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    cache = ResultCache(args.results_dir, args.archive_dir)
+    cache.refresh()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(cache))
+    print(f"Serving scan results from {args.results_dir} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# Columnar scan-history archive (Arrow IPC).
+#
+# Each scan writes one immutable file under <archive>/YYYY-MM/<run>.arrow, so
+# "appending" never rewrites earlier runs. Once a month is over, its run files
+# are compacted into <archive>/YYYY-MM.arrow: rows sorted by instId, one record
+# batch per instrument, and an instId -> batch index in the schema metadata.
+# Readers memory-map the files, skip months/runs outside the requested date
+# range from their paths alone, and for compacted months read only the batches
+# of the requested instruments.
+#
+# Only crypto_4af_6 (OKX perps via the official SDK) archives its runs;
+# crypto_4af_5 and crypto_4af_4 do not write to the archive. In CI the archive
+# is written to the throwaway runner and is not kept between runs.
+#
+#   import scan_archive
+#   table = scan_archive.read_archive(inst_ids=["BTC-USDT-SWAP"], start="2026-01-01")
+#   df = table.to_pandas()
+import json
+import os
+import re
+import shutil
+from datetime import date, datetime, timedelta, timezone
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+import scan_store
+
+ARCHIVE_DIR = os.environ.get('SCAN_ARCHIVE_DIR', os.path.join(scan_store.RESULTS_DIR, 'archive'))
+
+BLOCKS = ['dmi', 'rsi', 'macd', 'ichimoku', 'ma']
+
+SCHEMA = pa.schema([
+    ('run_ts', pa.timestamp('s', tz='UTC')),
+    ('instId', pa.dictionary(pa.int32(), pa.string())),
+    ('market_type', pa.dictionary(pa.int8(), pa.string())),
+    ('timeframe', pa.dictionary(pa.int8(), pa.string())),
+    ('score', pa.int16()),
+] + [(f'score_{b}', pa.int16()) for b in BLOCKS] + [
+    ('price', pa.float64()),
+])
+
+RUN_FORMAT = '%Y%m%dT%H%M%SZ'
+MONTH_FORMAT = '%Y-%m'
+INDEX_KEY = b'instId_batches'
+
+def _to_utc(value, end_of_day=False):
+    # A bare date ('2026-01-31' or a date object) means the start of that day,
+    # or its last second when end_of_day is set, so `end` includes the whole day
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+            value = date.fromisoformat(value)
+        else:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+        if end_of_day:
+            value += timedelta(days=1, seconds=-1)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def _month_start(month):
+    return datetime.strptime(month, MONTH_FORMAT).replace(tzinfo=timezone.utc)
+
+def append_run(results, run_ts=None, archive_dir=None):
+    # results: same shape as scan_store.write_scan(), rows carrying a "blocks" dict.
+    # A row's own "scanned_at" (e.g. resumed from a checkpoint) overrides run_ts.
+    archive_dir = archive_dir or ARCHIVE_DIR
+    run_ts = _to_utc(run_ts) or datetime.now(timezone.utc).replace(microsecond=0)
+
+    cols = {name: [] for name in SCHEMA.names}
+    for label, rows in results.items():
+        for row in rows:
+            blocks = row.get('blocks', {})
+            cols['run_ts'].append(_to_utc(row.get('scanned_at')) or run_ts)
+            cols['instId'].append(row['instId'])
+            cols['market_type'].append(row['market_type'])
+            cols['timeframe'].append(label)
+            cols['score'].append(row['score'])
+            for b in BLOCKS:
+                cols[f'score_{b}'].append(blocks.get(b))
+            cols['price'].append(row['price'])
+
+    table = pa.Table.from_pydict(cols, schema=SCHEMA)
+
+    month_dir = os.path.join(archive_dir, run_ts.strftime(MONTH_FORMAT))
+    os.makedirs(month_dir, exist_ok=True)
+    path = os.path.join(month_dir, run_ts.strftime(RUN_FORMAT) + '.arrow')
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with ipc.new_file(sink, SCHEMA) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    print(f"Archived {table.num_rows} rows to {path}")
+
+    compact_closed_months(archive_dir, before=run_ts)
+    return path
+
+def compact_month(month, archive_dir=None):
+    # Merge <month>/*.arrow into <month>.arrow, one record batch per instId
+    archive_dir = archive_dir or ARCHIVE_DIR
+    month_dir = os.path.join(archive_dir, month)
+    path = os.path.join(archive_dir, month + '.arrow')
+
+    tables = []
+    if os.path.exists(path):
+        tables.append(_read_file(path))
+    for name in sorted(os.listdir(month_dir)):
+        if name.endswith('.arrow'):
+            tables.append(_read_file(os.path.join(month_dir, name)))
+
+    if tables:
+        # Sort on plain strings, then re-encode with a single shared dictionary per column
+        plain = pa.schema([pa.field(f.name, f.type.value_type) if pa.types.is_dictionary(f.type) else f
+                           for f in SCHEMA])
+        table = pa.concat_tables([t.cast(plain) for t in tables])
+        table = table.sort_by([('instId', 'ascending'), ('run_ts', 'ascending'), ('timeframe', 'ascending')])
+        table = table.cast(SCHEMA).combine_chunks().unify_dictionaries().combine_chunks()
+
+        inst = table['instId'].cast(pa.string())
+        starts = [0]
+        if table.num_rows > 1:
+            changed = pc.not_equal(inst.slice(1), inst.slice(0, table.num_rows - 1))
+            starts += [i + 1 for i in pc.indices_nonzero(changed).to_pylist()]
+        bounds = list(zip(starts, starts[1:] + [table.num_rows]))
+        index = {inst[s].as_py(): i for i, (s, _) in enumerate(bounds)}
+
+        schema = SCHEMA.with_metadata({INDEX_KEY: json.dumps(index)})
+        tmp_path = path + '.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with ipc.new_file(sink, schema) as writer:
+                for s, e in bounds:
+                    writer.write_batch(table.slice(s, e - s).to_batches()[0])
+        os.replace(tmp_path, path)
+        print(f"Compacted {month}: {table.num_rows} rows, {len(index)} instruments -> {path}")
+
+    shutil.rmtree(month_dir)
+    return path
+
+def compact_closed_months(archive_dir=None, before=None):
+    # Compact every month directory older than the month of `before` (default: now)
+    archive_dir = archive_dir or ARCHIVE_DIR
+    current = (_to_utc(before) or datetime.now(timezone.utc)).strftime(MONTH_FORMAT)
+    if not os.path.isdir(archive_dir):
+        return []
+    closed = [m for m in sorted(os.listdir(archive_dir))
+              if m < current and os.path.isdir(os.path.join(archive_dir, m))]
+    return [compact_month(m, archive_dir) for m in closed]
+
+def list_runs(archive_dir=None, start=None, end=None):
+    # Archive files in time order, pruned by [start, end] using only their paths.
+    # Returns (ts, path, compacted); a compacted month's ts is its first day.
+    archive_dir = archive_dir or ARCHIVE_DIR
+    start, end = _to_utc(start), _to_utc(end, end_of_day=True)
+    if not os.path.isdir(archive_dir):
+        return []
+
+    runs = []
+    for entry in sorted(os.listdir(archive_dir)):
+        month = entry[:-len('.arrow')] if entry.endswith('.arrow') else entry
+        try:
+            month_start = _month_start(month)
+        except ValueError:
+            continue
+        if start and month < start.strftime(MONTH_FORMAT):
+            continue
+        if end and month_start > end:
+            continue
+        entry_path = os.path.join(archive_dir, entry)
+
+        if entry.endswith('.arrow'):
+            runs.append((month_start, entry_path, True))
+            continue
+        if not os.path.isdir(entry_path):
+            continue
+        for name in sorted(os.listdir(entry_path)):
+            if not name.endswith('.arrow'):
+                continue
+            try:
+                ts = datetime.strptime(name[:-len('.arrow')], RUN_FORMAT).replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            if start and ts < start:
+                continue
+            if end and ts > end:
+                continue
+            runs.append((ts, os.path.join(entry_path, name), False))
+    runs.sort(key=lambda r: r[0])
+    return runs
+
+def _read_file(path, inst_ids=None):
+    with pa.memory_map(path, 'r') as source:
+        reader = ipc.open_file(source)
+        meta = reader.schema.metadata or {}
+        if inst_ids and INDEX_KEY in meta:
+            # Compacted month: only the requested instruments' batches are read
+            index = json.loads(meta[INDEX_KEY])
+            batches = [reader.get_batch(index[i]) for i in inst_ids if i in index]
+            if not batches:
+                return SCHEMA.empty_table()
+            table = pa.Table.from_batches(batches)
+        else:
+            table = reader.read_all()
+    return table.replace_schema_metadata(None)
+
+def _dict_is_in(column, values):
+    # Match on dictionary codes rather than decoding every string
+    value_set = pa.array(values, pa.string())
+    chunks = []
+    for chunk in column.chunks:
+        codes = pc.indices_nonzero(pc.is_in(chunk.dictionary, value_set=value_set))
+        chunks.append(pc.is_in(chunk.indices, value_set=codes.cast(chunk.indices.type)))
+    return pa.chunked_array(chunks, pa.bool_())
+
+def read_archive(inst_ids=None, start=None, end=None, timeframes=None, columns=None,
+                 limit=None, archive_dir=None):
+    # Returns a pyarrow.Table; call .to_pandas() on it if a DataFrame is wanted.
+    # A date-only `end` includes that whole day. With `limit`, files are read
+    # newest first and reading stops once the last `limit` rows are known.
+    if isinstance(inst_ids, str):
+        inst_ids = [inst_ids]
+    if isinstance(timeframes, str):
+        timeframes = [timeframes]
+    start_ts, end_ts = _to_utc(start), _to_utc(end, end_of_day=True)
+
+    schema = SCHEMA if columns is None else pa.schema([SCHEMA.field(c) for c in columns])
+    pieces = []
+    found = 0
+    for _, path, compacted in reversed(list_runs(archive_dir, start, end)):
+        table = _read_file(path, inst_ids)
+        mask = None
+        if inst_ids and not compacted:
+            mask = _dict_is_in(table['instId'], inst_ids)
+        if timeframes:
+            tf_mask = _dict_is_in(table['timeframe'], timeframes)
+            mask = tf_mask if mask is None else pc.and_(mask, tf_mask)
+        if compacted and (start_ts or end_ts):
+            # Compacted months were only pruned as a whole; trim to the exact range
+            for op, bound in ((pc.greater_equal, start_ts), (pc.less_equal, end_ts)):
+                if bound:
+                    m = op(table['run_ts'], pa.scalar(bound, SCHEMA.field('run_ts').type))
+                    mask = m if mask is None else pc.and_(mask, m)
+        if mask is not None:
+            table = table.filter(mask)
+        if table.num_rows:
+            pieces.append(table.select(schema.names))
+            found += table.num_rows
+            if limit and found >= limit:
+                break
+
+    if not pieces:
+        return schema.empty_table()
+    table = pa.concat_tables(reversed(pieces)).unify_dictionaries()
+    if limit:
+        table = table.slice(max(table.num_rows - limit, 0))
+    return table
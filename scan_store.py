@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# Result store shared by the scanners and the local query API (scan_api.py).
+# Every scan rewrites latest.json (full per-timeframe rankings + indicator
+# snapshots); score history lives in the columnar archive (scan_archive.py).
+# A deadline-bounded scan that runs out of time also leaves checkpoint.json so
+# the next run can resume the remaining instruments.
+import json
+import math
+import os
+import time
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.environ.get('SCAN_RESULTS_DIR', 'scan_results')
+LATEST_FILE = 'latest.json'
+CHECKPOINT_FILE = 'checkpoint.json'
+
+# Indicator columns score_asset() leaves on the dataframe
+SNAPSHOT_COLUMNS = [
+    'adx', 'plus', 'minus', 'rsi', 'rsi_ma', 'macd', 'signal', 'hist',
+    'ema3', 'ma3', 'ema5', 'ma6', 'cl', 'bl', 'ma20', 'ma33'
+]
+
+def _clean(value):
+    value = float(value)
+    return None if math.isnan(value) or math.isinf(value) else round(value, 10)
+
+def indicator_snapshot(df):
+    last = df.iloc[-1]
+    return {col: _clean(last[col]) for col in SNAPSHOT_COLUMNS if col in df.columns}
+
+def latest_path(results_dir=None):
+    return os.path.join(results_dir or RESULTS_DIR, LATEST_FILE)
+
+def checkpoint_path(results_dir=None):
+    return os.path.join(results_dir or RESULTS_DIR, CHECKPOINT_FILE)
+
+def _write_json(path, payload):
+    # Write to a temp file and swap it in so readers never see a half-written file
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def write_scan(results, scanner, results_dir=None, generated_at=None, coverage=None):
+    # results: {timeframe label: [{"instId", "market_type", "score", "price", "indicators"}, ...]}
+    results_dir = results_dir or RESULTS_DIR
+    os.makedirs(results_dir, exist_ok=True)
+    generated_at = generated_at or datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    timeframes = {}
+    for label, rows in results.items():
+        timeframes[label] = sorted(rows, key=lambda r: -r['score'])
+
+    payload = {
+        'scanner': scanner,
+        'generated_at': generated_at,
+        'coverage': coverage,
+        'timeframes': timeframes,
+    }
+
+    path = latest_path(results_dir)
+    _write_json(path, payload)
+
+    print(f"Scan results saved to {path}")
+    return path
+
+def previous_scores(results_dir=None):
+    # Best score per instId across timeframes from the last completed scan
+    try:
+        with open(latest_path(results_dir)) as f:
+            latest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    scores = {}
+    for rows in latest.get('timeframes', {}).values():
+        for row in rows:
+            scores[row['instId']] = max(row['score'], scores.get(row['instId'], row['score']))
+    return scores
+
+def save_checkpoint(started_at, done, results, unarchived=None, results_dir=None):
+    # started_at is the epoch time the interrupted scan began, kept across resumes.
+    # results holds every row for the report; unarchived the rows not yet in the
+    # scan archive (e.g. when the process was killed before reaching append_run).
+    results_dir = results_dir or RESULTS_DIR
+    os.makedirs(results_dir, exist_ok=True)
+    _write_json(checkpoint_path(results_dir), {
+        'started_at': started_at,
+        'done': sorted(done),
+        'results': results,
+        'unarchived': unarchived or {},
+    })
+
+def load_checkpoint(max_age, results_dir=None):
+    try:
+        with open(checkpoint_path(results_dir)) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - checkpoint.get('started_at', 0) > max_age:
+        print("Ignoring stale scan checkpoint")
+        clear_checkpoint(results_dir)
+        return None
+    return checkpoint
+
+def clear_checkpoint(results_dir=None):
+    try:
+        os.remove(checkpoint_path(results_dir))
+    except FileNotFoundError:
+        pass
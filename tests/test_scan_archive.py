@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+import scan_archive
+
+
+def _rows(*inst_ids, score=10):
+    return {
+        "Daily": [{"instId": i, "market_type": "Perp USDT", "score": score, "price": 1.5,
+                   "blocks": {"dmi": 5, "ma": 5}} for i in inst_ids],
+        "4H": [{"instId": i, "market_type": "Perp USDT", "score": score + 1, "price": 1.5}
+               for i in inst_ids],
+    }
+
+
+def _ts(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return str(tmp_path / "archive")
+
+
+def test_list_runs_prunes_by_date(archive):
+    for ts in ("2026-01-30T09:00:00Z", "2026-01-31T15:00:00Z", "2026-02-01T00:00:00Z"):
+        scan_archive.append_run(_rows("BTC-USDT-SWAP"), run_ts=ts, archive_dir=archive)
+
+    # Appending in February compacts January into one file
+    runs = scan_archive.list_runs(archive)
+    assert [(ts, compacted) for ts, _, compacted in runs] == [
+        (_ts(2026, 1, 1), True),
+        (_ts(2026, 2, 1), False),
+    ]
+    assert scan_archive.list_runs(archive, start="2026-02-01") == runs[1:]
+    assert scan_archive.list_runs(archive, end="2026-01-31") == runs[:1]
+
+
+def test_date_only_end_includes_whole_day(archive):
+    scan_archive.append_run(_rows("BTC-USDT-SWAP"), run_ts="2026-01-31T15:00:00Z", archive_dir=archive)
+
+    # Open month (run files) and compacted month must agree
+    for _ in range(2):
+        table = scan_archive.read_archive(start="2026-01-01", end="2026-01-31", archive_dir=archive)
+        assert table.num_rows == 2
+        assert scan_archive.read_archive(end="2026-01-30", archive_dir=archive).num_rows == 0
+        scan_archive.compact_closed_months(archive, before="2026-02-01")
+
+
+def test_read_archive_filters_and_limit(archive):
+    for day in (1, 2, 3):
+        scan_archive.append_run(_rows("BTC-USDT-SWAP", "ETH-USDT-SWAP", score=day),
+                                run_ts=_ts(2026, 1, day), archive_dir=archive)
+    scan_archive.append_run(_rows("BTC-USDT-SWAP", score=4), run_ts=_ts(2026, 2, 1), archive_dir=archive)
+
+    table = scan_archive.read_archive(inst_ids="BTC-USDT-SWAP", timeframes="Daily", archive_dir=archive)
+    assert table.column("score").to_pylist() == [1, 2, 3, 4]
+    assert set(table.column("instId").to_pylist()) == {"BTC-USDT-SWAP"}
+    assert table.column("score_dmi").to_pylist() == [5, 5, 5, 5]
+
+    last = scan_archive.read_archive(inst_ids="BTC-USDT-SWAP", timeframes="Daily", limit=2, archive_dir=archive)
+    assert last.column("run_ts").to_pylist() == [_ts(2026, 1, 3), _ts(2026, 2, 1)]
+
+    eth = scan_archive.read_archive(inst_ids=["ETH-USDT-SWAP"], start="2026-01-02", end="2026-01-02",
+                                    columns=["run_ts", "score"], archive_dir=archive)
+    assert eth.column_names == ["run_ts", "score"]
+    assert sorted(eth.column("score").to_pylist()) == [2, 3]
+
+
+def test_read_archive_empty_or_missing(archive):
+    missing = scan_archive.read_archive(inst_ids="BTC-USDT-SWAP", archive_dir=archive)
+    assert missing.num_rows == 0
+    assert missing.schema.names == scan_archive.SCHEMA.names
+    assert scan_archive.list_runs(archive) == []
+
+    scan_archive.append_run(_rows("BTC-USDT-SWAP"), run_ts="2026-01-05T00:00:00Z", archive_dir=archive)
+    scan_archive.compact_closed_months(archive, before="2026-02-01")
+    assert scan_archive.read_archive(inst_ids="NOPE-USDT-SWAP", archive_dir=archive).num_rows == 0
+    assert scan_archive.read_archive(timeframes="1W", archive_dir=archive).num_rows == 0
+
+
+def test_scanned_at_overrides_run_ts(archive):
+    results = _rows("BTC-USDT-SWAP")
+    results["Daily"][0]["scanned_at"] = "2026-01-01T00:00:00Z"
+    scan_archive.append_run(results, run_ts="2026-01-01T09:00:00Z", archive_dir=archive)
+
+    table = scan_archive.read_archive(timeframes="Daily", archive_dir=archive)
+    assert table.column("run_ts").to_pylist() == [_ts(2026, 1, 1)]
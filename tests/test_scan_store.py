@@ -0,0 +1,55 @@
+import time
+
+import scan_store
+
+
+def _row(inst_id, score):
+    return {"instId": inst_id, "market_type": "Perp USDT", "score": score, "price": 1.0,
+            "scanned_at": "2026-01-01T00:00:00Z"}
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    results = {"Daily": [_row("BTC-USDT-SWAP", 40)], "4H": []}
+    unarchived = {"Daily": [_row("BTC-USDT-SWAP", 40)]}
+    started_at = time.time()
+    scan_store.save_checkpoint(started_at, {"ETH-USDT-SWAP", "BTC-USDT-SWAP"}, results, unarchived,
+                               results_dir=str(tmp_path))
+
+    checkpoint = scan_store.load_checkpoint(3600, results_dir=str(tmp_path))
+    assert checkpoint["started_at"] == started_at
+    assert checkpoint["done"] == ["BTC-USDT-SWAP", "ETH-USDT-SWAP"]
+    assert checkpoint["results"] == results
+    assert checkpoint["unarchived"] == unarchived
+
+
+def test_checkpoint_without_unarchived_rows(tmp_path):
+    scan_store.save_checkpoint(time.time(), set(), {"Daily": []}, results_dir=str(tmp_path))
+    assert scan_store.load_checkpoint(3600, results_dir=str(tmp_path))["unarchived"] == {}
+
+
+def test_stale_checkpoint_is_discarded(tmp_path):
+    scan_store.save_checkpoint(time.time() - 7200, {"BTC-USDT-SWAP"}, {}, results_dir=str(tmp_path))
+
+    assert scan_store.load_checkpoint(3600, results_dir=str(tmp_path)) is None
+    assert not (tmp_path / scan_store.CHECKPOINT_FILE).exists()
+
+
+def test_missing_or_corrupt_checkpoint(tmp_path):
+    assert scan_store.load_checkpoint(3600, results_dir=str(tmp_path)) is None
+    (tmp_path / scan_store.CHECKPOINT_FILE).write_text("{not json")
+    assert scan_store.load_checkpoint(3600, results_dir=str(tmp_path)) is None
+
+
+def test_clear_checkpoint(tmp_path):
+    scan_store.save_checkpoint(time.time(), set(), {}, results_dir=str(tmp_path))
+    scan_store.clear_checkpoint(results_dir=str(tmp_path))
+    scan_store.clear_checkpoint(results_dir=str(tmp_path))  # already gone: no error
+    assert scan_store.load_checkpoint(3600, results_dir=str(tmp_path)) is None
+
+
+def test_previous_scores_take_best_timeframe(tmp_path):
+    assert scan_store.previous_scores(results_dir=str(tmp_path)) == {}
+    scan_store.write_scan({"Daily": [_row("BTC-USDT-SWAP", 40), _row("ETH-USDT-SWAP", 10)],
+                           "4H": [_row("BTC-USDT-SWAP", 70)]},
+                          scanner="test", results_dir=str(tmp_path))
+    assert scan_store.previous_scores(results_dir=str(tmp_path)) == {"BTC-USDT-SWAP": 70, "ETH-USDT-SWAP": 10}